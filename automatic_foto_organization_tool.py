@@ -4,16 +4,50 @@ Created on Sat Apr 30 19:36:25 2022
 
 import os
 import json
-import re
-from datetime import datetime
+import glob
+import functools
+import argparse
+import time
 import sys
 from tqdm import tqdm
 import shutil
+import errno
+from concurrent.futures import ThreadPoolExecutor
+from collections import defaultdict
 
 
+# Static paths, resolved once at import
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_CFG_DIR = os.path.join(_HERE, "configs")
+
+# File extensions (lower case) that are handled as pictures
+_IMG_EXTS = frozenset({"jpg", "jpeg", "png", "tif", "tiff", "bmp"})
+
+# Progress bars redraw at most twice a second and are skipped if nobody is watching
+_TQDM_OPTIONS = {"mininterval": 0.5, "miniters": 100, "disable": None}
+
+# Windows and (by default) macOS filesystems ignore the case of file names, there the filename cache compares
+# case folded names
+_CASE_INSENSITIVE_FS = sys.platform in ("win32", "darwin")
+
+# Known filenames per destination directory (see _name_key()), filled by create_dst_path_for_file()
+_dir_contents = {}
+
+# Destination directories whose listing is already part of _dir_contents
+_listed_dirs = set()
+
+# Last copy index used per (destination directory, filename), filled by create_dst_path_for_file()
+_copy_index = {}
+
+# Destination directories that are known to exist, filled by ensure_directory()
+_ensured_dirs = set()
+
+
+@functools.lru_cache(maxsize=1)
 def initialize() -> dict:
     """
-    Load the first found config file in subfolder "config"
+    Load the first found config file in subfolder "config". The parsed config is cached, so repeated calls do not
+    read the file again.
     
     Parameters
     ----------
@@ -24,91 +58,108 @@ def initialize() -> dict:
         loaded configuration as dictionary
     """  
     # Load config from file
-    base_path_file = os.path.dirname(__file__)
-    config_path = os.path.join(base_path_file, "configs/")
-    config_files_list = os.listdir(config_path) 
+    config_files = sorted(glob.glob(os.path.join(_CFG_DIR, "*.json")))
     
-    for file in config_files_list:
-        if file.endswith(".json"):
-            filename = file
-            break
+    if len(config_files) == 0:
+        print("The defined configuration files does not exist! Check spelling and start again!")
+        return None
     
-    file_path = os.path.join(config_path, filename)
     try:
-        with open(file_path, 'r') as file:
-            txt = file.read()
-            file.close()
-    except:
-        txt = None
-    
-    if txt is not None:
-        config = json.loads(txt)
-    else:
-        print("The defined configuration files does not exist! Check spelling and start again!")
+        with open(config_files[0], 'r') as file:
+            config = json.load(file)
+    except OSError:
+        print("The defined configuration file could not be read! Check the file and start again!")
+        return None
+    except json.JSONDecodeError as e:
+        print(f"The defined configuration file is no valid json ({e})! Check the file and start again!")
         return None
         
     return config
 
 
-def get_all_files_from_source(src_path: str) -> list:
+def _is_image(filename: str, extensions: frozenset = _IMG_EXTS) -> bool:
     """
-    walks the given directory and lists all files with path in the given directory
+    Checks by the file extension if the given filename is a picture
     
     Parameters
     ----------
-    src_path: str
-        string to the directory
+    filename: str
+        name of the file without path
+    extensions: frozenset
+        lower case file extensions that count as pictures, defaults to the image extensions
     
     Returns
     ------
-    files: list
-        list of all files in the given directory
+    is_image: bool
+        True if the file has a picture extension
     """
-    files = []
-    
-    # get all files from source folder
-    all_files_walk = []
-    for root, dirs, files in os.walk(src_path, topdown=False):
-       for name in files:
-           path = os.path.join(root, name)
-           all_files_walk.append(path)
-       for name in dirs:
-           path = os.path.join(root, name)
-           all_files_walk.append(path)
-    
-    # filter to only have files
-    files = []
-    for file_path in all_files_walk:
-    #    print(file_path)
-        if os.path.isfile(file_path):
-            files.append(file_path)
+    name, _, ext = filename.rpartition('.')
+    return bool(name) and ext.lower() in extensions
 
-    return files
+
+def _scan(path: str):
+    """
+    Recursively walks the given directory with os.scandir and yields all files. Type and size are taken from the
+    DirEntry, so no additional os.path calls are needed per file. Files are classified into pictures on the way.
+    
+    Parameters
+    ----------
+    path: str
+        string to the directory
+    
+    Returns
+    ------
+    files: generator
+        tuples of (file_path, is_image, size in bytes) for all files in the given directory
+    """
+    try:
+        it = os.scandir(path)
+    except OSError:
+        # like os.walk: skip directories that do not exist or can not be read
+        return
+    with it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _scan(entry.path)
+            elif entry.is_file():
+                yield entry.path, _is_image(entry.name), entry.stat().st_size
 
 
-def get_size_of_directory(start_path: str) -> int:
+def scan_source(src_path: str) -> (list, list, list, int):
     """
-    Walks a path and adds the sizes of all directories to get the total size in bytes of the given path
+    Walks the given directory once, lists all files with path, splits them into pictures and other files and adds up
+    their sizes in bytes
     
     Parameters
     ----------
-    start_path: str
-        string with path to directory
+    src_path: str
+        string to the directory
     
     Returns
     ------
+    files: list
+        list of all files in the given directory
+    imgs: list
+        list of all files with a picture extension
+    others: list
+        list of all other files
     total_size: int
         int showing the size of the directory in bytes
     """
+    files = []
+    imgs = []
+    others = []
     total_size = 0
-    if not os.path.exists(start_path):
-        return None
     
-    for path, dirs, files in os.walk(start_path):
-        for f in files:
-            fp = os.path.join(path, f)
-            total_size += os.path.getsize(fp)
-    return total_size
+    for path, is_image, size in _scan(src_path):
+        files.append(path)
+        if is_image:
+            imgs.append(path)
+        else:
+            others.append(path)
+        total_size += size
+    
+    return files, imgs, others, total_size
 
 
 def format_bytes(size: int) -> (int, str):
@@ -127,59 +178,17 @@ def format_bytes(size: int) -> (int, str):
     unit: str
         showing the new unit of the size with power label
     """
-    # 2**10 = 1024
-    power = 2**10
-    n = 0
-    power_labels = {0 : '', 1: 'kilo', 2: 'mega', 3: 'giga', 4: 'tera'}
-    try:
-        while size > power:
-            size /= power
-            n += 1
-            
-        new_size = round(size, 3)
-        unit = power_labels[n]+'bytes'
-        return new_size, unit
-    except Exception as e:
-        print(e)
-        return None, None
-    
-
-def filter_files_with_regex(files_list: list, filename_regex=r"") -> (list, list):
-    """
-    Splits list of input filenames into matching and non-matching with a regex.
-    
-    Parameters
-    ----------
-    files_list: list
-        list of filename to be split up
-    
-    Returns
-    ------
-    imgs: list
-        list of all files matching the regex
-    others: list
-        list of all files not matching the regex
-    """
-    imgs = []
-    others = []
-    
-    filename_regex = r"(?P<filename>.*)\.(?P<extension>JPG|jpg|jpeg|PNG|png|tiff|tif|TIF|BMP|bmp)"
-    
-    for file in files_list:
-        (path, image) = os.path.split(file)
-        filename_matches = re.finditer(filename_regex, image, re.UNICODE)
-        filename, extension = None, None
-        for match in filename_matches:
-            filename, extension = match.groups()
-        if not filename or not extension:
-            others.append(file)
-            continue
-        imgs.append(file)
+    power_labels = ('', 'kilo', 'mega', 'giga', 'tera')
+    if size <= 0:
+        return 0, power_labels[0]+'bytes'
     
-    assert len(files_list) == (len(imgs) + len(others)), "Length of lists do not match!"
+    # every power label is 2**10 = 1024 times bigger than the previous one
+    n = min(len(power_labels) - 1, (size.bit_length() - 1) // 10)
+    # plain bytes stay an int
+    new_size = round(size / (1 << (10 * n)), 3) if n > 0 else size
+    unit = power_labels[n]+'bytes'
+    return new_size, unit
     
-    return imgs, others
-
 
 def process_images(imgs: list, config: dict):
     """
@@ -197,17 +206,50 @@ def process_images(imgs: list, config: dict):
     None.
 
     """
-    start = datetime.now()
+    start = time.perf_counter()
     success_list = []
     copy_list = []
     problem_list = []
     
-    end = datetime.now()
-    diff_time_seconds = (end - start).seconds
+    end = time.perf_counter()
+    diff_time_seconds = end - start
     return success_list, copy_list, problem_list, diff_time_seconds
  
 
-def move_other_files(files: list, config: dict) -> (list, list, int):
+def _move_file(job: tuple) -> (bool, str):
+    """
+    Moves a single file, used as worker for the thread pool in move_other_files()
+    
+    Parameters
+    ----------
+    job: tuple
+        (source path, destination path) of the file
+    
+    Returns
+    ------
+    moved: bool
+        True if the file got moved successfully
+    src_path: str
+        source path of the file
+    """
+    src_path, dst_path = job
+    try:
+        # a plain rename is enough on the same filesystem
+        os.replace(src_path, dst_path)
+        return True, src_path
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            return False, src_path
+    
+    # source and destination are on different filesystems, copy and delete
+    try:
+        shutil.move(src_path, dst_path)
+        return True, src_path
+    except Exception:
+        return False, src_path
+
+
+def move_other_files(files: list, config: dict) -> (list, list, float):
     """
     Extracts the datatype of the files, creates folders and moves the files to its new directory
     
@@ -224,43 +266,103 @@ def move_other_files(files: list, config: dict) -> (list, list, int):
         list of images that got moved successully
     problem_files: list
         list of images where a problem occured in the process
-    diff_time_seconds: int
+    diff_time_seconds: float
         measure how long this function needed to run in seconds
     """
-    start = datetime.now()
+    start = time.perf_counter()
     success_files = []
     problem_files = []
     
-    sys.stdout.flush() # Force output of previous prints()
-    for file in tqdm(files):
+    # Group files by extension, so every destination folder is prepared only once
+    groups = defaultdict(list)
+    for file in files:
         (path, filename_full) = os.path.split(file)
-        filename = filename_full.split('.')[0]
-        extension = filename_full.split('.')[1]
-        base_path = os.path.join(config["destination_path"], "Other Files", f"{extension}_Files")
-        
-        # Create base_path folder if not exists
-        if not os.path.exists(base_path):
-            os.makedirs(base_path)
-            
-        dst_path = create_dst_path_for_file(base_path, filename, extension)
-    
-        # Move file to dst
-        try:
-            shutil.move(file, dst_path)
-            success_files.append(file)
-        except:
-            problem_files.append(file)
+        filename, extension = os.path.splitext(filename_full)
+        groups[extension[1:]].append((file, filename))
+    
+    # Resolve all destinations first, so the collision check stays sequential
+    jobs = []
+    dest_root = os.path.join(config["destination_path"], "Other Files")
+    for extension, group in groups.items():
+        base_path = os.path.join(dest_root, f"{extension if extension else 'No_extension'}_Files")
+        ensure_directory(base_path)
+        for file, filename in group:
+            dst_path, _ = create_dst_path_for_file(base_path, filename, extension)
+            jobs.append((file, dst_path))
+    
+    sys.stdout.flush() # Force output of previous prints()
+    # Move files to dst, moving is IO bound so threads can overlap it
+    max_workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for moved, file in tqdm(executor.map(_move_file, jobs), total=len(jobs), **_TQDM_OPTIONS):
+            if moved:
+                success_files.append(file)
+            else:
+                problem_files.append(file)
             
-    end = datetime.now()
-    diff_time_seconds = (end - start).seconds
+    end = time.perf_counter()
+    diff_time_seconds = end - start
     
     return success_files, problem_files, diff_time_seconds
 
 
+def ensure_directory(path: str):
+    """
+    Creates the given directory if it does not exist yet. Directories are only checked once per run.
+    
+    Parameters
+    ----------
+    path: str
+        string with path to directory
+    
+    Returns
+    ------
+    
+    """
+    if path not in _ensured_dirs:
+        os.makedirs(path, exist_ok=True)
+        _ensured_dirs.add(path)
+
+
+def _name_key(name: str) -> str:
+    """
+    Normalizes a file or directory name for the filename cache. Names are only case folded on case-insensitive
+    filesystems, where e.g. "IMG.jpg" and "img.jpg" are the same file.
+    
+    Parameters
+    ----------
+    name: str
+        name or path of a file or directory
+    
+    Returns
+    ------
+    name_key: str
+        name as compared by the filesystem
+    """
+    return name.casefold() if _CASE_INSENSITIVE_FS else name
+
+
+def _dir_key(path: str) -> str:
+    """
+    Normalizes a directory path for the filename cache, so differently written paths share one entry
+    
+    Parameters
+    ----------
+    path: str
+        string with path to directory
+    
+    Returns
+    ------
+    dir_key: str
+        absolute, normalized path
+    """
+    return _name_key(os.path.normcase(os.path.abspath(path)))
+
+
 def create_dst_path_for_file(base_path, filename, extension):
     """
     A destination path is created with a given base, filename and extension. If the file already exists a copy label 
-    will be included
+    will be included. The base path has to exist already, see ensure_directory().
     
     Parameters
     ----------
@@ -275,88 +377,144 @@ def create_dst_path_for_file(base_path, filename, extension):
     ------
     dst_path: str
         path including base, filename and extension as string
+    is_copy: bool
+        True if the copy label "_Kopie(<n>)" was added to the filename
     """
-    # Create base_path folder if not exists
-    if not os.path.exists(base_path):
-        os.makedirs(base_path)
+    # filenames in base_path are read once and then kept up to date in memory. On case-insensitive filesystems
+    # different cased directories share one entry, so a file can not be overwritten by a differently cased name.
+    dir_key = _dir_key(base_path)
+    contents = _dir_contents.setdefault(dir_key, set())
+    if base_path not in _listed_dirs:
+        contents.update(_name_key(name) for name in os.listdir(base_path))
+        _listed_dirs.add(base_path)
     
     # create dst file name and check if exists already
-    created_filename = f"{filename}.{extension.lower()}"
-    dst_path = os.path.join(base_path, created_filename)
-    if os.path.exists(dst_path):
-        good_to_go = False
-        index = 0
-        while good_to_go == False:
+    # files without extension (e.g. ".hidden") get no trailing dot
+    suffix = f".{extension.lower()}" if extension else ""
+    created_filename = f"{filename}{suffix}"
+    is_copy = _name_key(created_filename) in contents
+    if is_copy:
+        # continue after the last copy index used for this name, a burst of copies would probe 1..k again otherwise
+        key = (dir_key, _name_key(created_filename))
+        index = _copy_index.get(key, 0)
+        while _name_key(created_filename) in contents:
             index += 1
-            created_filename = f"{filename}_Kopie({index}).{extension.lower()}"
-            dst_path = os.path.join(base_path, created_filename)
-            if not os.path.exists(dst_path):
-                good_to_go = True
+            created_filename = f"{filename}_Kopie({index}){suffix}"
+        _copy_index[key] = index
+    contents.add(_name_key(created_filename))
+    dst_path = os.path.join(base_path, created_filename)
     
-    return dst_path  
+    return dst_path, is_copy  
    
 
-def main():
+def organize(config: dict) -> dict:
     """
-    Main function, will call all necessary functions in the needed order
+    Sorts the source folder of the given config into its destination folder. Caches of destination folders are kept
+    between calls, so several source folders can be organized in one run.
     
     Parameters
     ----------
+    config: dict
+        loaded configuration as dictionary
     
     Returns
     ------
     results_dict: dict
         dictionary collecting all produced results
     """
-    print("Welcome to the Foto Organization Tool!")
-    config = initialize()
     results_dict = {}
     
-    if config is not None:
-        all_files_list = get_all_files_from_source(src_path=config["source_path"])
-        src_size_bytes = get_size_of_directory(start_path=config["source_path"])
-        src_size_format , src_size_unit = format_bytes(size=src_size_bytes)
-        results_dict["all_files"] = {
-                "all_files": all_files_list,
-                "all_files_count": len(all_files_list),
-                "dir_size": {"in_bytes": src_size_bytes,
-                             "src_format": src_size_format,
-                             "src_form_unit": src_size_unit
-                             }
-                }
-        print(f"\nThe folder includes {len(all_files_list)} files which use {str(src_size_format)} {src_size_unit} of space.")
-        
-        images, other_files= filter_files_with_regex(files_list=all_files_list)
-        results_dict["filter_with_regex"] = {
-                "images": images,
-                "imgages_count": len(images), 
-                "other_files": other_files,
-                "others_count": len(other_files)
-                }
-        print(f"The files are split in {len(images)} pictures and {len(other_files)} other files.")
-
-        print("\nThe pictures will now be analyzed and moved. This could take some time ...")
-        imgs_sucs, imgs_copy, imgs_prob, diff_time_exif = process_images(imgs=images, config=config) 
-         
-        results_dict["extract_exif_and_move"] = {
-                "imgs_sucs": imgs_sucs,
-                "imgs_copy": imgs_copy,
-                "imgs_prob": imgs_prob,
-                "diff_time_exif": diff_time_exif
+    all_files_list, images, other_files, src_size_bytes = scan_source(src_path=config["source_path"])
+    src_size_format , src_size_unit = format_bytes(size=src_size_bytes)
+    results_dict["all_files"] = {
+            "all_files": all_files_list,
+            "all_files_count": len(all_files_list),
+            "dir_size": {"in_bytes": src_size_bytes,
+                         "src_format": src_size_format,
+                         "src_form_unit": src_size_unit
+                         }
+            }
+    print(f"\nThe folder includes {len(all_files_list)} files which use {str(src_size_format)} {src_size_unit} of space.")
+    
+    results_dict["filter_with_regex"] = {
+            "images": images,
+            "imgages_count": len(images), 
+            "other_files": other_files,
+            "others_count": len(other_files)
+            }
+    print(f"The files are split in {len(images)} pictures and {len(other_files)} other files.")
+
+    print("\nThe pictures will now be analyzed and moved. This could take some time ...")
+    imgs_sucs, imgs_copy, imgs_prob, diff_time_exif = process_images(imgs=images, config=config) 
+     
+    results_dict["extract_exif_and_move"] = {
+            "imgs_sucs": imgs_sucs,
+            "imgs_copy": imgs_copy,
+            "imgs_prob": imgs_prob,
+            "diff_time_exif": diff_time_exif
+            }
+    
+    if len(other_files) > 0:
+        print("\n\nNow the no picture files will be sorted and moved. This could also take some time...")
+        f_sucs, f_prob, moving_time = move_other_files(files=other_files, config=config)
+        results_dict["moving_others"] = {
+                "f_sucs": f_sucs,
+                "f_prob": f_prob,
+                "moving_time": moving_time
                 }
         
-        if len(other_files) > 0:
-            print("\n\nNow the no picture files will be sorted and moved. This could also take some time...")
-            f_sucs, f_prob, moving_time = move_other_files(files=other_files, config=config)
-            results_dict["moving_others"] = {
-                    "f_sucs": f_sucs,
-                    "f_prob": f_prob,
-                    "moving_time": moving_time
-                    }
+    return results_dict
+
+
+def parse_arguments(argv: list = None) -> argparse.Namespace:
+    """
+    Parses the command line options, all of them are optional and override the loaded config
+    
+    Parameters
+    ----------
+    argv: list
+        list of command line arguments, sys.argv is used if not specified
     
+    Returns
+    ------
+    args: argparse.Namespace
+        parsed command line options
+    """
+    parser = argparse.ArgumentParser(description="Sorts fotos by the date they were taken.")
+    parser.add_argument("--source", action="append", dest="sources", metavar="PATH",
+                        help="source folder to organize, can be given several times (default: from config)")
+    parser.add_argument("--destination", metavar="PATH",
+                        help="destination folder for all sources (default: from config)")
+    return parser.parse_args(argv)
 
+
+def main(argv: list = None):
+    """
+    Main function, will call all necessary functions in the needed order
+    
+    Parameters
+    ----------
+    argv: list
+        list of command line arguments, sys.argv is used if not specified
+    
+    Returns
+    ------
+    results: dict
+        dictionary collecting all produced results per source folder
+    """
+    args = parse_arguments(argv)
+    print("Welcome to the Foto Organization Tool!")
+    config = initialize()
+    results = {}
+    
+    if config is not None:
+        sources = args.sources if args.sources else [config["source_path"]]
+        destination = args.destination if args.destination else config["destination_path"]
+        for source in sources:
+            source_config = dict(config, source_path=source, destination_path=destination)
+            results[source] = organize(config=source_config)
         
-    return results_dict
+    return results
 
 
 if __name__ == "__main__":
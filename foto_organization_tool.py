@@ -4,11 +4,14 @@ Inspired by ct.de/wtnz
 
 import logging
 from datetime import datetime
+import time
 from tqdm import tqdm
 from PIL import Image
-from PIL.ExifTags import TAGS
 import shutil
 import re
+import errno
+from concurrent.futures import ThreadPoolExecutor
+from collections import defaultdict
 import json
 import os
 import sys
@@ -18,10 +21,10 @@ import sys
 easy_logging = True
 if easy_logging is True:
     # Configure logging
-    logger = logging.getLogger()
+    logger = logging.getLogger(__name__)
     logging.basicConfig(level=logging.WARNING, format="%(levelname)s - %(funcName)s: %(message)s")
 else:
-    logger = logging.getLogger()
+    logger = logging.getLogger(__name__)
     # create file handler which logs even debug messages
     fh = logging.FileHandler(str(__file__.split('/')[-1].split('.')[0]) + '.log')
     fh.setLevel(logging.DEBUG)
@@ -41,6 +44,34 @@ else:
 start_time = datetime.now()
 logger.info('Script started successfully!')
 
+# File extensions (lower case) that are handled as pictures
+_IMG_EXTS = frozenset({"jpg", "jpeg", "png", "tif", "tiff", "bmp"})
+
+# Copy label added by create_dst_path_for_file(), matched against the filename without extension
+_COPY_RE = re.compile(r"(?P<filename>.*)_Kopie\(\d+\)")
+
+# Exif tag id of DateTime
+_EXIF_DATETIME_TAG = 306
+
+# Progress bars redraw at most twice a second and are skipped if nobody is watching
+_TQDM_OPTIONS = {"mininterval": 0.5, "miniters": 100, "disable": None}
+
+# Windows and (by default) macOS filesystems ignore the case of file names, there the filename cache compares
+# case folded names
+_CASE_INSENSITIVE_FS = sys.platform in ("win32", "darwin")
+
+# Known filenames per destination directory (see _name_key()), filled by create_dst_path_for_file()
+_dir_contents = {}
+
+# Destination directories whose listing is already part of _dir_contents
+_listed_dirs = set()
+
+# Last copy index used per (destination directory, filename), filled by create_dst_path_for_file()
+_copy_index = {}
+
+# Destination directories that are known to exist, filled by ensure_directory()
+_ensured_dirs = set()
+
 
 def initialize() -> dict:
     """
@@ -65,19 +96,16 @@ def initialize() -> dict:
         return None
     
     file_path = os.path.join(config_path, filename)
-    logger.debug(f"Read txt from json file. Filename: {file_path}")
+    logger.debug("Read txt from json file. Filename: %s", file_path)
     try:
         with open(file_path, 'r') as file:
-            txt = file.read()
-            file.close()
-    except:
-        txt = None
-    
-    if txt is not None:
-        config = json.loads(txt)
-    else:
+            config = json.load(file)
+    except OSError:
         print("The defined configuration files does not exist! Check spelling and start again!")
         return None
+    except json.JSONDecodeError as e:
+        print(f"The defined configuration file is no valid json ({e})! Check the file and start again!")
+        return None
 
     config_approval_message = "Following configuration is loaded:\n\n" + json.dumps(config, indent=4) + \
         "\n\nAre you fine with that?\nPlease press 'y' for approval or 'n' to stop the programm and start again.\n"
@@ -116,11 +144,11 @@ def await_user_input_from_list_decision(list_to_decide: list, header_message: st
         user_decision = list_to_decide[0]
         
     else:
-        indexes = list(range(0, len(list_to_decide)))
+        indexes = [str(idx) for idx in range(len(list_to_decide))]
         sorted_list = sorted(list_to_decide)
         message_str = header_message + "\n"
-        for idx in range(0, len(list_to_decide)):
-            number_str = f"{idx}\t: {sorted_list[idx]}\n"
+        for idx, value in enumerate(sorted_list):
+            number_str = f"{idx}\t: {value}\n"
             message_str += number_str
         
         message_str += "\nSelect a number to choose a value:\n"
@@ -148,9 +176,8 @@ def await_user_input(message: str, allowed_answers: list = None) -> str:
     """
     allowed_answers_str_list = []
     if allowed_answers is not None:
-        for element in allowed_answers:
-            allowed_answers_str_list.append(str(element))
-    logging.debug(f"Ask for approval for message: {message}")
+        allowed_answers_str_list = [str(element) for element in allowed_answers]
+    logger.debug("Ask for approval for message: %s", message)
     user_input = ""
     good_to_go = False
     while good_to_go != True:
@@ -167,34 +194,94 @@ def await_user_input(message: str, allowed_answers: list = None) -> str:
             user_input = inp
             good_to_go = True
     
-    logging.debug(f"User input of approval: {user_input}")
+    logger.debug("User input of approval: %s", user_input)
     
     return user_input
 
 
-def get_size_of_directory(start_path: str) -> int:
+def _is_image(filename: str, extensions: frozenset = _IMG_EXTS) -> bool:
     """
-    Walks a path and adds the sizes of all directories to get the total size in bytes of the given path
+    Checks by the file extension if the given filename is a picture
     
     Parameters
     ----------
-    start_path: str
-        string with path to directory
+    filename: str
+        name of the file without path
+    extensions: frozenset
+        lower case file extensions that count as pictures, defaults to the image extensions
+    
+    Returns
+    ------
+    is_image: bool
+        True if the file has a picture extension
+    """
+    name, _, ext = filename.rpartition('.')
+    return bool(name) and ext.lower() in extensions
+
+
+def _scan(path: str):
+    """
+    Recursively walks the given directory with os.scandir and yields all files. Type and size are taken from the
+    DirEntry, so no additional os.path calls are needed per file. Files are classified into pictures on the way.
+    
+    Parameters
+    ----------
+    path: str
+        string to the directory
+    
+    Returns
+    ------
+    files: generator
+        tuples of (file_path, is_image, size in bytes) for all files in the given directory
+    """
+    try:
+        it = os.scandir(path)
+    except OSError:
+        # like os.walk: skip directories that do not exist or can not be read
+        return
+    with it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _scan(entry.path)
+            elif entry.is_file():
+                yield entry.path, _is_image(entry.name), entry.stat().st_size
+
+
+def scan_source(src_path: str) -> (list, list, list, int):
+    """
+    Walks the given directory once, lists all files with path, splits them into pictures and other files and adds up
+    their sizes in bytes
+    
+    Parameters
+    ----------
+    src_path: str
+        string to the directory
     
     Returns
     ------
+    files: list
+        list of all files in the given directory
+    imgs: list
+        list of all files with a picture extension
+    others: list
+        list of all other files
     total_size: int
         int showing the size of the directory in bytes
     """
+    files = []
+    imgs = []
+    others = []
     total_size = 0
-    if not os.path.exists(start_path):
-        return None
     
-    for path, dirs, files in os.walk(start_path):
-        for f in files:
-            fp = os.path.join(path, f)
-            total_size += os.path.getsize(fp)
-    return total_size
+    for path, is_image, size in _scan(src_path):
+        files.append(path)
+        if is_image:
+            imgs.append(path)
+        else:
+            others.append(path)
+        total_size += size
+    
+    return files, imgs, others, total_size
 
 
 def format_bytes(size: int) -> (int, str):
@@ -213,100 +300,75 @@ def format_bytes(size: int) -> (int, str):
     unit: str
         showing the new unit of the size with power label
     """
-    # 2**10 = 1024
-    power = 2**10
-    n = 0
-    power_labels = {0 : '', 1: 'kilo', 2: 'mega', 3: 'giga', 4: 'tera'}
-    try:
-        while size > power:
-            size /= power
-            n += 1
-            
-        new_size = round(size, 3)
-        unit = power_labels[n]+'bytes'
-        return new_size, unit
-    except Exception as e:
-        logger.error(e)
-        return None, None
+    power_labels = ('', 'kilo', 'mega', 'giga', 'tera')
+    if size <= 0:
+        return 0, power_labels[0]+'bytes'
+    
+    # every power label is 2**10 = 1024 times bigger than the previous one
+    n = min(len(power_labels) - 1, (size.bit_length() - 1) // 10)
+    # plain bytes stay an int
+    new_size = round(size / (1 << (10 * n)), 3) if n > 0 else size
+    unit = power_labels[n]+'bytes'
+    return new_size, unit
 
 
-def get_all_files_from_source(src_path: str) -> list:
+def ensure_directory(path: str):
     """
-    walks the given directory and lists all files with path in the given directory
+    Creates the given directory if it does not exist yet. Directories are only checked once per run.
     
     Parameters
     ----------
-    src_path: str
-        string to the directory
+    path: str
+        string with path to directory
     
     Returns
     ------
-    files: list
-        list of all files in the given directory
-    """
-    files = []
     
-    # get all files from source folder
-    all_files_walk = []
-    for root, dirs, files in os.walk(src_path, topdown=False):
-       for name in files:
-           path = os.path.join(root, name)
-           all_files_walk.append(path)
-       for name in dirs:
-           path = os.path.join(root, name)
-           all_files_walk.append(path)
-    
-    # filter to only have files
-    files = []
-    for file_path in all_files_walk:
-    #    print(file_path)
-        if os.path.isfile(file_path):
-            files.append(file_path)
-
-    return files
+    """
+    if path not in _ensured_dirs:
+        os.makedirs(path, exist_ok=True)
+        _ensured_dirs.add(path)
 
 
-def filter_files_with_regex(files_list: list, filename_regex=r"") -> (list, list):
+def _name_key(name: str) -> str:
     """
-    Splits list of input filenames into matching and non-matching with a regex.
+    Normalizes a file or directory name for the filename cache. Names are only case folded on case-insensitive
+    filesystems, where e.g. "IMG.jpg" and "img.jpg" are the same file.
     
     Parameters
     ----------
-    files_list: list
-        list of filename to be split up
+    name: str
+        name or path of a file or directory
     
     Returns
     ------
-    imgs: list
-        list of all files matching the regex
-    others: list
-        list of all files not matching the regex
+    name_key: str
+        name as compared by the filesystem
     """
-    imgs = []
-    others = []
-    
-    filename_regex = r"(?P<filename>.*)\.(?P<extension>JPG|jpg|jpeg|PNG|png|tiff|tif|TIF|BMP|bmp)"
-    
-    for file in files_list:
-        (path, image) = os.path.split(file)
-        filename_matches = re.finditer(filename_regex, image, re.UNICODE)
-        filename, extension = None, None
-        for match in filename_matches:
-            filename, extension = match.groups()
-        if not filename or not extension:
-            others.append(file)
-            continue
-        imgs.append(file)
+    return name.casefold() if _CASE_INSENSITIVE_FS else name
+
+
+def _dir_key(path: str) -> str:
+    """
+    Normalizes a directory path for the filename cache, so differently written paths share one entry
     
-    assert len(files_list) == (len(imgs) + len(others)), "Length of lists do not match!"
+    Parameters
+    ----------
+    path: str
+        string with path to directory
     
-    return imgs, others
+    Returns
+    ------
+    dir_key: str
+        absolute, normalized path
+    """
+    return _name_key(os.path.normcase(os.path.abspath(path)))
 
 
 def create_dst_path_for_file(base_path, filename, extension):
     """
     A destination path is created with a given base, filename and extension. If the file already exists a copy label 
-    will be included
+    will be included. The base path has to exist already, see ensure_directory().
     
     Parameters
     ----------
@@ -321,28 +383,89 @@ def create_dst_path_for_file(base_path, filename, extension):
     ------
     dst_path: str
         path including base, filename and extension as string
+    is_copy: bool
+        True if the copy label "_Kopie(<n>)" was added to the filename
     """
-    # Create base_path folder if not exists
-    if not os.path.exists(base_path):
-        os.makedirs(base_path)
+    # filenames in base_path are read once and then kept up to date in memory. On case-insensitive filesystems
+    # different cased directories share one entry, so a file can not be overwritten by a differently cased name.
+    dir_key = _dir_key(base_path)
+    contents = _dir_contents.setdefault(dir_key, set())
+    if base_path not in _listed_dirs:
+        contents.update(_name_key(name) for name in os.listdir(base_path))
+        _listed_dirs.add(base_path)
     
     # create dst file name and check if exists already
-    created_filename = f"{filename}.{extension.lower()}"
-    dst_path = os.path.join(base_path, created_filename)
-    if os.path.exists(dst_path):
-        good_to_go = False
-        index = 0
-        while good_to_go == False:
+    # files without extension (e.g. ".hidden") get no trailing dot
+    suffix = f".{extension.lower()}" if extension else ""
+    created_filename = f"{filename}{suffix}"
+    is_copy = _name_key(created_filename) in contents
+    if is_copy:
+        # continue after the last copy index used for this name, a burst of copies would probe 1..k again otherwise
+        key = (dir_key, _name_key(created_filename))
+        index = _copy_index.get(key, 0)
+        while _name_key(created_filename) in contents:
             index += 1
-            created_filename = f"{filename}_Kopie({index}).{extension.lower()}"
-            dst_path = os.path.join(base_path, created_filename)
-            if not os.path.exists(dst_path):
-                good_to_go = True
+            created_filename = f"{filename}_Kopie({index}){suffix}"
+        _copy_index[key] = index
+    contents.add(_name_key(created_filename))
+    dst_path = os.path.join(base_path, created_filename)
     
-    return dst_path    
+    return dst_path, is_copy    
 
 
-def extract_exif_from_image_and_move_to_dest_folder(imgs: list, config: dict) -> (list, list, list, int):
+def _read_exif_info(image_path: str) -> (str, str, str, str, str, bool):
+    """
+    Reads the date the photo was taken from its exif data and builds the new filename. Used as worker for the thread
+    pool in extract_exif_from_image_and_move_to_dest_folder()
+    
+    Parameters
+    ----------
+    image_path: str
+        path to the picture
+    
+    Returns
+    ------
+    image_path: str
+        path to the picture
+    year_str: str
+        year the photo was taken, None without valid exif data
+    year_month_str: str
+        year and month the photo was taken, None without valid exif data
+    filename: str
+        new filename without extension, the original one without valid exif data
+    extension: str
+        extension of the file
+    valid_exif: bool
+        True if the date could be read from the exif data
+    """
+    try:
+        # Image.open only parses the header, getexif() reads the first IFD without decoding any pixels
+        with Image.open(image_path) as image:
+            exifdata = image.getexif()
+            extension = image.format.lower()
+        # only DateTime is needed, so no other tag gets translated or decoded
+        dt = exifdata[_EXIF_DATETIME_TAG]
+        # decode bytes 
+        if isinstance(dt, bytes):
+            dt = dt.decode()
+        # exif DateTime has the fixed layout "YYYY:MM:DD HH:MM:SS", slicing is much cheaper than strptime
+        if len(dt) != 19 or dt[4] + dt[7] + dt[10] + dt[13] + dt[16] != ":: ::":
+            raise ValueError(f"Unexpected exif DateTime: {dt}")
+        # building the datetime validates the values
+        datetime(int(dt[0:4]), int(dt[5:7]), int(dt[8:10]), int(dt[11:13]), int(dt[14:16]), int(dt[17:19]))
+        year_str = dt[0:4]
+        year_month_str = f"{dt[0:4]}_{dt[5:7]}"
+        
+        filename = f"{dt[0:4]}-{dt[5:7]}-{dt[8:10]}_{dt[11:13]}-{dt[14:16]}-{dt[17:19]}"
+        return image_path, year_str, year_month_str, filename, extension, True
+        
+    except Exception:
+        (path, filename_full) = os.path.split(image_path)
+        filename, extension = os.path.splitext(filename_full)
+        return image_path, None, None, filename, extension[1:], False
+
+
+def extract_exif_from_image_and_move_to_dest_folder(imgs: list, config: dict) -> (list, list, list, float):
     """
     Extracts the needed information of the photos, creates the corresponding destination path and moves the file 
     to its new direction. Creates lists to follow the process.
@@ -362,10 +485,10 @@ def extract_exif_from_image_and_move_to_dest_folder(imgs: list, config: dict) ->
         list of images that got moved successully and has the label "Kopie" in its name
     problem_list: list
         list of images where a problem occured in the process
-    diff_time_seconds: int
+    diff_time_seconds: float
         measure how long this function needed to run in seconds
     """
-    start = datetime.now()
+    start = time.perf_counter()
     success_list = []
     copy_list = []
     problem_list = []
@@ -378,68 +501,82 @@ def extract_exif_from_image_and_move_to_dest_folder(imgs: list, config: dict) ->
         include_year = False 
     
     sys.stdout.flush() # Force output of previous prints()
-    # loop over images
-    for image_path in tqdm(imgs):
-#        print(image_path)
-        try:
-            image = Image.open(image_path)
-            exifdata = image._getexif()
-            image.close()
-            exif_dict = {}
-            for tag_id in exifdata:
-                # get the tag name, instead of human unreadable tag id
-                tag = TAGS.get(tag_id, tag_id)
-                data = exifdata.get(tag_id)
-                # decode bytes 
-                if isinstance(data, bytes):
-                    data = data.decode()
-                exif_dict[tag] = data
-            image_time = datetime.strptime(exif_dict["DateTime"], "%Y:%m:%d %H:%M:%S")
-            year_str = image_time.strftime("%Y")
-            year_month_str = image_time.strftime("%Y_%m")
-            
-            filename = f"{image_time.strftime('%Y-%m-%d')}_{image_time.strftime('%H-%M-%S')}"
-            extension = image.format.lower()
-            valid_exif = True
+    # read exif data of all images first, it is IO bound and runs in threads
+    jobs = []
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        exif_infos = tqdm(executor.map(_read_exif_info, imgs), total=len(imgs), **_TQDM_OPTIONS)
+        for image_path, year_str, year_month_str, filename, extension, valid_exif in exif_infos:
+            # define new path for picture
+            if valid_exif is True and include_year is True:
+                base_path = os.path.join(output_folder, year_str, year_month_str)
             
-        except:
-            image.close()
-            (path, filename_full) = os.path.split(image_path)
-            filename = filename_full.split('.')[0]
-            extension = filename_full.split('.')[1]
-            valid_exif = False
-            
-        
-        # define new path for picture
-        if valid_exif is True and include_year is True:
-            base_path = os.path.join(output_folder, year_str, year_month_str)
+            elif valid_exif is True and include_year is False:
+                base_path = os.path.join(output_folder, year_month_str)
             
-        elif valid_exif is True and include_year is False:
-            base_path = os.path.join(output_folder, year_month_str)
+            else: # valid_exif is False
+                base_path = os.path.join(output_folder, "No_exif_data")
             
-        else: # valid_exif is False
-            base_path = os.path.join(output_folder, "No_exif_data")
-
-        dst_path = create_dst_path_for_file(base_path, filename, extension)
+            jobs.append((image_path, base_path, filename, extension))
+    
+    # there are only a few destination folders, create each of them once
+    for base_path in set(job[1] for job in jobs):
+        ensure_directory(base_path)
+    
+    for image_path, base_path, filename, extension in jobs:
+        dst_path, is_copy = create_dst_path_for_file(base_path, filename, extension)
                     
         # Move image to dst
-        try:
-            shutil.move(image_path, dst_path)
+        moved, image_path = _move_file((image_path, dst_path))
+        if moved:
             success_list.append(dst_path)
-            if "Kopie" in dst_path:
+            if is_copy:
                 copy_list.append(dst_path)
-        except:
+        else:
             problem_list.append(image_path)
             
     assert len(imgs) == len(success_list) + len(problem_list), "Lengths of lists do not match!"
     
-    end = datetime.now()
-    diff_time_seconds = (end - start).seconds
+    end = time.perf_counter()
+    diff_time_seconds = end - start
     
     return success_list, copy_list, problem_list, diff_time_seconds
 
 
-def move_other_files(files: list, config: dict) -> (list, list, int):
+def _move_file(job: tuple) -> (bool, str):
+    """
+    Moves a single file with a plain rename if possible, used for pictures and as worker for the thread pool in
+    move_other_files()
+    
+    Parameters
+    ----------
+    job: tuple
+        (source path, destination path) of the file
+    
+    Returns
+    ------
+    moved: bool
+        True if the file got moved successfully
+    src_path: str
+        source path of the file
+    """
+    src_path, dst_path = job
+    try:
+        # a plain rename is enough on the same filesystem
+        os.replace(src_path, dst_path)
+        return True, src_path
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            return False, src_path
+    
+    # source and destination are on different filesystems, copy and delete
+    try:
+        shutil.move(src_path, dst_path)
+        return True, src_path
+    except Exception:
+        return False, src_path
+
+
+def move_other_files(files: list, config: dict) -> (list, list, list, float):
     """
     Extracts the datatype of the files, creates folders and moves the files to its new directory
     
@@ -454,39 +591,55 @@ def move_other_files(files: list, config: dict) -> (list, list, int):
     ------
     success_files: list
         list of images that got moved successully
+    copy_files: list
+        list of destinations of moved files that got the label "Kopie" in its name
     problem_files: list
         list of images where a problem occured in the process
-    diff_time_seconds: int
+    diff_time_seconds: float
         measure how long this function needed to run in seconds
     """
-    start = datetime.now()
+    start = time.perf_counter()
     success_files = []
+    copy_files = []
     problem_files = []
     
-    sys.stdout.flush() # Force output of previous prints()
-    for file in tqdm(files):
+    # Group files by extension, so every destination folder is prepared only once
+    groups = defaultdict(list)
+    for file in files:
         (path, filename_full) = os.path.split(file)
-        filename = filename_full.split('.')[0]
-        extension = filename_full.split('.')[1]
-        base_path = os.path.join(config["destination_path"], "Other Files", f"{extension}_Files")
-        
-        # Create base_path folder if not exists
-        if not os.path.exists(base_path):
-            os.makedirs(base_path)
-            
-        dst_path = create_dst_path_for_file(base_path, filename, extension)
+        filename, extension = os.path.splitext(filename_full)
+        groups[extension[1:]].append((file, filename))
+    
+    # Resolve all destinations first, so the collision check stays sequential
+    jobs = []
+    labelled = set()
+    dest_root = os.path.join(config["destination_path"], "Other Files")
+    for extension, group in groups.items():
+        base_path = os.path.join(dest_root, f"{extension if extension else 'No_extension'}_Files")
+        ensure_directory(base_path)
+        for file, filename in group:
+            dst_path, is_copy = create_dst_path_for_file(base_path, filename, extension)
+            jobs.append((file, dst_path))
+            if is_copy:
+                labelled.add(dst_path)
     
-        # Move file to dst
-        try:
-            shutil.move(file, dst_path)
-            success_files.append(file)
-        except:
-            problem_files.append(file)
+    sys.stdout.flush() # Force output of previous prints()
+    # Move files to dst, moving is IO bound so threads can overlap it
+    max_workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = tqdm(executor.map(_move_file, jobs), total=len(jobs), **_TQDM_OPTIONS)
+        for (moved, file), (src_path, dst_path) in zip(results, jobs):
+            if moved:
+                success_files.append(file)
+                if dst_path in labelled:
+                    copy_files.append(dst_path)
+            else:
+                problem_files.append(file)
             
-    end = datetime.now()
-    diff_time_seconds = (end - start).seconds
+    end = time.perf_counter()
+    diff_time_seconds = end - start
     
-    return success_files, problem_files, diff_time_seconds
+    return success_files, copy_files, problem_files, diff_time_seconds
 
 
 def delete_empty_folders(directory: str, levels: int =10):
@@ -510,15 +663,39 @@ def delete_empty_folders(directory: str, levels: int =10):
                 os.rmdir(dirpath)
 
 
-def delete_copy_pictures_from_destination(config: dict) -> (list, list):
+def _same_file_head(file_a: str, file_b: str, length: int = 4096) -> bool:
+    """
+    Compares the first bytes of two files, a cheap check against deleting a different picture of the same size
+    
+    Parameters
+    ----------
+    file_a: str
+        path to the first file
+    file_b: str
+        path to the second file
+    length: int
+        amount of bytes to compare
+    
+    Returns
+    ------
+    same: bool
+        True if the first bytes of both files are equal
+    """
+    try:
+        with open(file_a, 'rb') as fa, open(file_b, 'rb') as fb:
+            return fa.read(length) == fb.read(length)
+    except OSError:
+        return False
+
+
+def delete_copy_pictures_from_destination(copy_list: list) -> (list, list, int):
     """
-    Loop over destination directory and collect all files with "Kopie" in it. Compare these file with the original and
-    delete the copy if the sizes match.
+    Compare the given files labelled "_Kopie(<n>)" with the original and delete the copy if the sizes match.
     
     Parameters
     ----------
-    dconfig: dict
-        loaded configuration as dictionary, for the destination path
+    copy_list: list
+        list of copies to check, from extract_exif_from_image_and_move_to_dest_folder() and move_other_files()
     
     Returns
     ------
@@ -526,51 +703,53 @@ def delete_copy_pictures_from_destination(config: dict) -> (list, list):
         files that where deleted successfully
     problem_files: list
         files that could not be deleted
+    size_deleted: int
+        bytes freed by deleting the files
     """
     sys.stdout.flush() # Force output of previous prints()
-    path = config["destination_path"]
-    
-    # get all files in destination folder
-    all_files = get_all_files_from_source(src_path=path)
-    
-    # get files with copies
-    quene = []
-    for file in all_files:
-        if "Kopie" in file and os.path.isfile(file):
-            quene.append(file)
+    quene = list(copy_list)
     
     problem_files = []
     deleted_files = []
-    for file in tqdm(quene):
-        if os.path.isfile(file):
-            org_file = file.split("Kopie")[0][:-1] + "." + file.split(".")[-1]
-            size_org_file = os.path.getsize(org_file)
+    size_deleted = 0
+    for file in tqdm(quene, **_TQDM_OPTIONS):
+        # "<name>_Kopie(<n>)<.ext>" is a copy of "<name><.ext>", only a real copy label may lead to a deletion
+        (path, filename_full) = os.path.split(file)
+        head, ext = os.path.splitext(filename_full)
+        match = _COPY_RE.fullmatch(head)
+        org_file = os.path.join(path, match.group("filename") + ext) if match else file
+        if org_file == file:
+            problem_files.append((file, "No copy label"))
+            continue
+        try:
             size_file = os.path.getsize(file)
-            
-            if size_file == size_org_file:
-                deleted_files.append(file)
-            else:
-                problem_files.append((file, "Size does not match"))
-        else:
+            size_org_file = os.path.getsize(org_file)
+        except OSError:
             problem_files.append((file, "No file"))
-                
-    counter = 0
-    del_files = deleted_files.copy()
-    while len(del_files) > 0 or counter < 10:
-        counter += 1
-        for file in del_files:
-            if os.path.exists(file):
-                os.remove(file)
-            else:
-                del_files.remove(file)
-    
-    if len(del_files) > 0:
-        for file in del_files:
+            continue
+        
+        if size_file != size_org_file:
+            problem_files.append((file, "Size does not match"))
+            continue
+        
+        if not _same_file_head(file, org_file):
+            problem_files.append((file, "Content does not match"))
+            continue
+        
+        try:
+            os.remove(file)
+        except FileNotFoundError:
+            problem_files.append((file, "No file"))
+            continue
+        except OSError:
             problem_files.append((file, "Could not be deleted"))
+            continue
+        deleted_files.append(file)
+        size_deleted += size_file
             
     assert len(quene) == len(deleted_files) + len(problem_files), "Length of delete lists do not match"
             
-    return deleted_files, problem_files
+    return deleted_files, problem_files, size_deleted
 
 
 def final_comprehention_and_print_message(config: dict, results_dict: dict):
@@ -621,8 +800,7 @@ def main():
     results_dict = {}
     
     if config is not None:
-        all_files_list = get_all_files_from_source(src_path=config["source_path"])
-        src_size_bytes = get_size_of_directory(start_path=config["source_path"])
+        all_files_list, images, other_files, src_size_bytes = scan_source(src_path=config["source_path"])
         src_size_format , src_size_unit = format_bytes(size=src_size_bytes)
         results_dict["all_files"] = {
                 "all_files": all_files_list,
@@ -634,7 +812,6 @@ def main():
                 }
         print(f"\nThe folder includes {len(all_files_list)} files which use {str(src_size_format)} {src_size_unit} of space.")
         
-        images, other_files= filter_files_with_regex(files_list=all_files_list)
         results_dict["filter_with_regex"] = {
                 "images": images,
                 "imgages_count": len(images), 
@@ -654,9 +831,10 @@ def main():
                 }
         
         print("\n\nNow the no picture files will be sorted and moved. This could also take some time...")
-        f_sucs, f_prob, moving_time = move_other_files(files=other_files, config=config)
+        f_sucs, f_copy, f_prob, moving_time = move_other_files(files=other_files, config=config)
         results_dict["moving_others"] = {
                 "f_sucs": f_sucs,
+                "f_copy": f_copy,
                 "f_prob": f_prob,
                 "moving_time": moving_time
                 }
@@ -667,10 +845,9 @@ def main():
             
         if str(config["delete_copy_pictures"]).lower() in ["true"]:
             print("\n\nDelete copy pictures now ...")
-            size_before = get_size_of_directory(start_path=config["destination_path"])
-            deleted_pictures, problem_pictures = delete_copy_pictures_from_destination(config=config)
-            size_after = get_size_of_directory(start_path=config["destination_path"])
-            size_diff_form, size_diff_unit = format_bytes(size=(size_before-size_after))
+            deleted_pictures, problem_pictures, size_diff = delete_copy_pictures_from_destination(
+                    copy_list=imgs_copy + f_copy)
+            size_diff_form, size_diff_unit = format_bytes(size=size_diff)
         else: 
             deleted_pictures, problem_pictures = (None, None)
             size_diff_form, size_diff_unit = (None, None)
@@ -699,5 +876,5 @@ if __name__ == "__main__":
 # Measure running time:
 end_time = datetime.now()
 logger.info('End of Script!')
-logger.debug('Runtime of script: {}'.format(end_time - start_time))
+logger.debug('Runtime of script: %s', end_time - start_time)
 logger.debug("End of logging.\n\n")